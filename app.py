@@ -1,89 +1,230 @@
 import streamlit as st
+import asyncio
+import hashlib
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import tempfile
 import gc
 import time
 import yaml
 
 from tqdm import tqdm
-from youtube_api_scraper import fetch_channel_videos
+from youtube_api_scraper import fetch_channels_batch, fetch_video_transcript
 from dotenv import load_dotenv
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
-# Force .env to override any system-wide environment variables
-load_dotenv(override=True)
+# Force .env to override any system-wide environment variables.
+# Streamlit re-executes this script on every rerun, so the parse is cached
+# per process with st.cache_resource (a plain lru_cache would be redefined).
+@st.cache_resource
+def _load_env():
+    load_dotenv(override=True)
+    return True
 
-from crewai import Agent, Crew, Process, Task, LLM  # Added LLM here
-from crewai_tools import FileReadTool
+_load_env()
+
+# Read the API keys once; they are validated when the page is first rendered
+YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
+OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 
-docs_tool = FileReadTool()
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+import litellm
+from crewai import Agent, Crew, Process, Task, LLM  # Added LLM here
 
+# Persist LLM responses on disk so unchanged transcripts skip the OpenRouter round trip.
+# Set up once per process, not on every rerun of this script.
 @st.cache_resource
-def load_llm():
+def _enable_llm_cache():
+    litellm.cache = litellm.Cache(type="disk", disk_cache_dir=".llm_cache")
+    return True
+
+_enable_llm_cache()
+
+def _openrouter_llm(model, max_tokens):
     return LLM(
-        model="openrouter/openai/gpt-4o", 
-        api_key=os.getenv("OPENROUTER_API_KEY"),
+        model=model,
+        api_key=OPENROUTER_API_KEY,
         base_url="https://openrouter.ai/api/v1",
         temperature=0.7,
-        max_tokens=2000,  # CRITICAL: token limit
+        max_tokens=max_tokens,  # CRITICAL: token limit
         extra_headers={
             "HTTP-Referer": "http://localhost:8501",
             "X-Title": "YouTube Analysis App"
         }
     )
 
+@st.cache_resource
+def load_llm_fast():
+    """Smaller, cheaper model for the per-transcript analysis runs"""
+    return _openrouter_llm("openrouter/openai/gpt-4o-mini", max_tokens=800)
+
+@st.cache_resource
+def load_llm_smart():
+    """Full model for the final synthesized report"""
+    return _openrouter_llm("openrouter/openai/gpt-4o", max_tokens=2000)
+
 # ===========================
-#   Define Agents & Tasks
+#   Live Agent Progress
 # ===========================
-def create_agents_and_tasks():
-    """Creates a Crew for analysis of the channel scrapped output"""
+def _make_step_log(placeholder):
+    """
+    Builds a factory of step callbacks that mirror agent steps into this run's
+    placeholder, each step prefixed with the label of the crew run it came from.
+    The callbacks are set on the per-run crew copies, never on the cached agents,
+    and run in the worker threads kickoff_async uses, so the script run context
+    is attached to those threads for the Streamlit calls.
+    """
+    ctx = get_script_run_ctx()
+    lock = threading.Lock()
+    chunks = []
+
+    def for_run(label):
+        def on_step(step):
+            add_script_run_ctx(threading.current_thread(), ctx)
+            text = getattr(step, "output", None) or getattr(step, "text", None) or str(step)
+            # Render under the lock so an older snapshot can't overwrite a newer one
+            with lock:
+                chunks.append(f"**{label}**: {text}")
+                placeholder.markdown("\n\n".join(chunks))
+        return on_step
+
+    return for_run
+
+def _run_copy(crew, step_callback, inputs):
+    # The cached crews are shared by every session, so only copies are kicked off
+    run = crew.copy()
+    run.step_callback = step_callback
+    return run.kickoff_async(inputs=inputs)
+
+async def _run_pipeline(videos, get_transcripts, analysis_crew, synthesis_crew, progress, step_log):
+    """
+    Producer/consumer pipeline: each video is queued as soon as its transcript
+    arrives and its analysis crew run is dispatched right away, so transcript
+    fetching and LLM calls overlap instead of running as separate stages.
+    """
+    queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+    # Transcript fetches get their own pool (the endpoint is rate limited, so at
+    # most 8 in flight) instead of sharing the default executor with crew runs
+    transcript_pool = ThreadPoolExecutor(max_workers=8)
+    done = 0
+
+    async def fetch(idx, video):
+        if get_transcripts:
+            await loop.run_in_executor(transcript_pool, fetch_video_transcript, video, 8.0)
+        return idx, video
+
+    async def analyze(video):
+        nonlocal done
+        analysis = await _run_copy(
+            analysis_crew, step_log(video.get('title')), {"transcripts": _format_transcript(video)}
+        )
+        done += 1
+        progress.info(f"Analyzed {done}/{len(videos)} videos...")
+        return analysis
 
+    async def produce():
+        for fetched in asyncio.as_completed([fetch(idx, video) for idx, video in enumerate(videos)]):
+            await queue.put(await fetched)
+        await queue.put(None)
+
+    async def consume():
+        runs = {}
+        while (item := await queue.get()) is not None:
+            idx, video = item
+            runs[idx] = asyncio.create_task(analyze(video))
+        return runs
+
+    progress.info(f"Analyzed 0/{len(videos)} videos...")
+    try:
+        _, runs = await asyncio.gather(produce(), consume())
+    finally:
+        transcript_pool.shutdown(wait=False)
+    # Keep the per-video analyses in the original video order
+    analyses = [await runs[idx] for idx in range(len(videos))]
+    progress.info("Synthesizing report...")
+    return await _run_copy(
+        synthesis_crew,
+        step_log("Synthesis"),
+        {"analyses": "\n\n---\n\n".join(str(analysis) for analysis in analyses)}
+    )
+
+# ===========================
+#   Define Agents & Tasks
+# ===========================
+@st.cache_resource
+def _load_config():
     with open("config.yaml", 'r') as file:
-        config = yaml.safe_load(file)
-    
-    # Initialize the specific OpenRouter LLM
-    custom_llm = load_llm()
-    
+        return yaml.load(file, Loader=YamlLoader)
+
+@st.cache_resource
+def get_crew():
+    """Creates the Crews for analysis of the channel scrapped output.
+
+    Returns an analysis crew, run once per transcript, and a synthesis crew
+    that turns the per-video analyses into the final report. Cached so the
+    agents and crews are built once instead of on every rerun; the cache is
+    shared across sessions, so callers must kick off copies, never these.
+    """
+
+    config = _load_config()
+    analysis_cfg, synthesizer_cfg = config["agents"][0], config["agents"][1]
+    analysis_task_cfg, response_task_cfg = config["tasks"][0], config["tasks"][1]
+
     analysis_agent = Agent(
-        role=config["agents"][0]["role"],
-        goal=config["agents"][0]["goal"],
-        backstory=config["agents"][0]["backstory"],
+        role=analysis_cfg["role"],
+        goal=analysis_cfg["goal"],
+        backstory=analysis_cfg["backstory"],
         verbose=True,
-        tools=[docs_tool],
-        llm=custom_llm,             # Explicitly set the custom LLM
-        allow_delegation=False      # Prevents spinning up default OpenAI manager
+        llm=load_llm_fast(),        # Explicitly set the custom LLM
+        allow_delegation=False,     # Prevents spinning up default OpenAI manager
+        cache=True
     )
 
     response_synthesizer_agent = Agent(
-        role=config["agents"][1]["role"],
-        goal=config["agents"][1]["goal"],
-        backstory=config["agents"][1]["backstory"],
+        role=synthesizer_cfg["role"],
+        goal=synthesizer_cfg["goal"],
+        backstory=synthesizer_cfg["backstory"],
         verbose=True,
-        llm=custom_llm,             # Explicitly set the custom LLM
-        allow_delegation=False
+        llm=load_llm_smart(),       # Explicitly set the custom LLM
+        allow_delegation=False,
+        cache=True
     )
 
     analysis_task = Task(
-        description=config["tasks"][0]["description"],
-        expected_output=config["tasks"][0]["expected_output"],
+        description=analysis_task_cfg["description"],
+        expected_output=analysis_task_cfg["expected_output"],
         agent=analysis_agent
     )
 
     response_task = Task(
-        description=config["tasks"][1]["description"],
-        expected_output=config["tasks"][1]["expected_output"],
+        description=response_task_cfg["description"],
+        expected_output=response_task_cfg["expected_output"],
         agent=response_synthesizer_agent
     )
 
-    crew = Crew(
-        agents=[analysis_agent, response_synthesizer_agent],
-        tasks=[analysis_task, response_task],
+    analysis_crew = Crew(
+        agents=[analysis_agent],
+        tasks=[analysis_task],
+        process=Process.sequential,
+        verbose=True,
+        cache=True
+    )
+
+    synthesis_crew = Crew(
+        agents=[response_synthesizer_agent],
+        tasks=[response_task],
         process=Process.sequential,
         verbose=True,
-        manager_llm=custom_llm,     # Force OpenRouter for manager logic
-        planning_llm=custom_llm,    # Force OpenRouter for planning logic
-        planning=False
+        cache=True
     )
-    return crew
+    return analysis_crew, synthesis_crew
 
 # ===========================
 #   Streamlit Setup
@@ -93,50 +234,86 @@ st.markdown("""
     # YouTube Trend Analysis powered by CrewAI & YouTube Data API
 """)
 
+missing_keys = [name for name, value in (("YOUTUBE_API_KEY", YOUTUBE_API_KEY), ("OPENROUTER_API_KEY", OPENROUTER_API_KEY)) if not value]
+if missing_keys:
+    st.error(f"{', '.join(missing_keys)} not found. Set it in .env")
+    st.stop()
+
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
 if "response" not in st.session_state:
     st.session_state.response = None
 
-if "crew" not in st.session_state:
-    st.session_state.crew = None
-
 def reset_chat():
     st.session_state.messages = []
     gc.collect()
 
+def render_video_grid(videos, videos_per_row=3):
+    """Renders all videos as one HTML grid of embeds instead of a st.video per video"""
+    embeds = "".join(
+        f"<iframe src='https://www.youtube.com/embed/{video['shortcode']}' "
+        f"style='width:100%;aspect-ratio:16/9;border:0' allowfullscreen></iframe>"
+        for video in videos
+    )
+    st.markdown(
+        f"<div style='display:grid;grid-template-columns:repeat({videos_per_row},1fr);gap:8px'>{embeds}</div>",
+        unsafe_allow_html=True
+    )
+
+def _format_transcript(video):
+    """Builds the transcript text handed to the analysis agent for a video"""
+    transcript_entries = video.get('formatted_transcript', []) or []
+    if transcript_entries:
+        lines = [f"({entry['start_time']:.2f}-{entry['end_time']:.2f}): {entry['text']}\n" for entry in transcript_entries]
+    else:
+        lines = [f"Title: {video.get('title')}\n", f"Desc: {video.get('description')}\n"]
+    return f"## {video.get('title')}\n" + "".join(lines)
+
 def start_analysis():
     status_container = st.empty()
-    
-    if not os.getenv("YOUTUBE_API_KEY"):
-        status_container.error("YOUTUBE_API_KEY not found.")
-        return
         
     valid_channels = [ch for ch in st.session_state.youtube_channels if ch and ch.strip()]
     
     if not valid_channels:
         status_container.error("Please add at least one YouTube channel URL.")
         return
+
+    quick_mode = st.session_state.get("quick_mode", False)
+    # Dates are kept as date objects in session state and only formatted here
+    start_date = st.session_state.start_date.strftime("%Y-%m-%d")
+    end_date = st.session_state.end_date.strftime("%Y-%m-%d")
+
+    # Identical inputs replay the previous response instead of re-scraping
+    analysis_key = hashlib.sha1(
+        repr((tuple(valid_channels), start_date, end_date, quick_mode)).encode()
+    ).hexdigest()
+    if st.session_state.get("last_key") == analysis_key and st.session_state.response:
+        status_container.info("Inputs unchanged, showing previous analysis")
+        st.markdown("## YouTube Videos Extracted")
+        render_video_grid(st.session_state.channel_scrapped_output)
+        return
+
+    # Invalidate the replay key up front: whatever this run leaves in session
+    # state (partial scrape, failed crew) must never be replayed for older inputs
+    st.session_state.last_key = None
     
     with st.spinner('Scraping videos...'):
         try:
-            get_transcripts = not st.session_state.get("quick_mode", False)
-            channel_scrapped_output = []
-            
-            for ch in valid_channels:
-                try:
-                    vids = fetch_channel_videos(
-                        ch,
-                        num_videos=3,
-                        start_date=st.session_state.start_date,
-                        end_date=st.session_state.end_date,
-                        get_transcripts=get_transcripts,
-                        transcript_timeout=8.0,
-                    )
-                    channel_scrapped_output.extend(vids)
-                except Exception as e:
-                    st.warning(f"Failed to fetch from {ch}: {e}")
+            get_transcripts = not quick_mode
+
+            # One batched scrape for all channels: lookups run in parallel and
+            # video metadata comes back from shared videos.list calls.
+            # Transcripts are fetched later, inside the analysis pipeline.
+            channel_scrapped_output, fetch_errors = fetch_channels_batch(
+                valid_channels,
+                num_videos=3,
+                start_date=start_date,
+                end_date=end_date,
+                api_key=YOUTUBE_API_KEY,
+            )
+            for ch, error in fetch_errors.items():
+                st.warning(f"Failed to fetch from {ch}: {error}")
             
             if not channel_scrapped_output:
                 st.error("No videos found.")
@@ -146,43 +323,30 @@ def start_analysis():
 
             # Display Videos
             st.markdown("## YouTube Videos Extracted")
-            carousel_container = st.container()
-            videos_per_row = 3
-            with carousel_container:
-                num_videos = len(channel_scrapped_output)
-                num_rows = (num_videos + videos_per_row - 1) // videos_per_row
-                for row in range(num_rows):
-                    cols = st.columns(videos_per_row)
-                    for col_idx in range(videos_per_row):
-                        video_idx = row * videos_per_row + col_idx
-                        if video_idx < num_videos:
-                            with cols[col_idx]:
-                                st.video(channel_scrapped_output[video_idx]['url'])
-
-            # File processing
-            st.session_state.all_files = []
-            os.makedirs("transcripts", exist_ok=True)
-            for i in range(len(channel_scrapped_output)):
-                youtube_video_id = channel_scrapped_output[i]['shortcode']
-                file_path = f"transcripts/{youtube_video_id}.txt"
-                with open(file_path, "w", encoding='utf-8') as f:
-                    transcript_entries = channel_scrapped_output[i].get('formatted_transcript', []) or []
-                    if transcript_entries:
-                        for entry in transcript_entries:
-                            f.write(f"({entry['start_time']:.2f}-{entry['end_time']:.2f}): {entry['text']}\n")
-                    else:
-                        f.write(f"Title: {channel_scrapped_output[i].get('title')}\n")
-                        f.write(f"Desc: {channel_scrapped_output[i].get('description')}\n")
-                st.session_state.all_files.append(file_path)
+            render_video_grid(channel_scrapped_output)
 
             st.session_state.channel_scrapped_output = channel_scrapped_output
             
             # Start CrewAI Analysis
             with st.spinner('Analyzing with CrewAI...'):
-                st.session_state.crew = create_agents_and_tasks()
-                st.session_state.response = st.session_state.crew.kickoff(
-                    inputs={"file_paths": ", ".join(st.session_state.all_files)}
-                )
+                analysis_crew, synthesis_crew = get_crew()
+
+                progress = st.empty()
+                step_placeholder = st.empty()
+                try:
+                    # Transcripts are passed in-memory as task inputs, no files or read tool involved
+                    st.session_state.response = asyncio.run(
+                        _run_pipeline(
+                            channel_scrapped_output, get_transcripts,
+                            analysis_crew, synthesis_crew, progress, _make_step_log(step_placeholder)
+                        )
+                    )
+                finally:
+                    progress.empty()
+                    step_placeholder.empty()
+                # Partial scrapes are not replayed, so failed channels get retried
+                if not fetch_errors:
+                    st.session_state.last_key = analysis_key
 
         except Exception as e:
             st.error(f"Execution failed: {str(e)}")
@@ -190,14 +354,12 @@ def start_analysis():
 # ===========================
 #   Sidebar & Main UI
 # ===========================
-with st.sidebar:
-    st.header("YouTube Channels")
-    if "youtube_channels" not in st.session_state:
-        st.session_state.youtube_channels = [""]
-    
-    def add_channel_field():
-        st.session_state.youtube_channels.append("")
-    
+def add_channel_field():
+    st.session_state.youtube_channels.append("")
+
+@st.fragment
+def channel_inputs():
+    """Channel URL list, rerun on its own so edits don't re-render the whole page"""
     for i, channel in enumerate(st.session_state.youtube_channels):
         col1, col2 = st.columns([6, 1])
         with col1:
@@ -207,17 +369,24 @@ with st.sidebar:
         with col2:
             if i > 0 and st.button("❌", key=f"remove_{i}"):
                 st.session_state.youtube_channels.pop(i)
-                st.rerun()
+                st.rerun(scope="fragment")
     
     st.button("Add Channel ➕", on_click=add_channel_field)
+
+with st.sidebar:
+    st.header("YouTube Channels")
+    if "youtube_channels" not in st.session_state:
+        st.session_state.youtube_channels = [""]
+    
+    channel_inputs()
     st.divider()
     
     st.subheader("Date Range")
     col1, col2 = st.columns(2)
     with col1:
-        st.session_state.start_date = st.date_input("Start Date").strftime("%Y-%m-%d")
+        st.session_state.start_date = st.date_input("Start Date")
     with col2:
-        st.session_state.end_date = st.date_input("End Date").strftime("%Y-%m-%d")
+        st.session_state.end_date = st.date_input("End Date")
 
     quick_mode = st.checkbox("⚡ Quick Mode (Skip Transcripts)", value=False)
     st.session_state.quick_mode = quick_mode
@@ -2,6 +2,7 @@ import os
 import time
 from datetime import datetime
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from youtube_transcript_api import YouTubeTranscriptApi
 from dotenv import load_dotenv
 
@@ -22,7 +23,7 @@ def _extract_channel_id(channel_url: str) -> str | None:
         return channel_url.split("/c/")[1].split("/")[0]
     return None
 
-def _resolve_channel_id(channel_url: str) -> str | None:
+def _resolve_channel_id(channel_url: str, api_key: str | None = None) -> str | None:
     """
     Resolve a channel URL/handle/custom name to a channelId via YouTube Data API.
     """
@@ -42,7 +43,7 @@ def _resolve_channel_id(channel_url: str) -> str | None:
         "q": extracted if extracted.startswith("@") else f"@{extracted}",
         "type": "channel",
         "maxResults": 1,
-        "key": YOUTUBE_API_KEY,
+        "key": api_key or YOUTUBE_API_KEY,
     }
     try:
         resp = requests.get(search_url, params=params, timeout=8)
@@ -65,25 +66,15 @@ def _iso_date(date_str: str | None, default_time: str) -> str | None:
     except Exception:
         return None
     
-def fetch_channel_videos(
+def _search_channel_items(
     channel_url: str,
-    num_videos: int = 3,
-    start_date: str | None = None,
-    end_date: str | None = None,
-    get_transcripts: bool = True,
-    transcript_timeout: float = 8.0,
-):
-    """
-    Fetch latest videos from a channel using YouTube Data API v3.
-    Returns list of dicts with metadata and optional transcripts.
-    """
-    if not YOUTUBE_API_KEY:
-        raise ValueError("YOUTUBE_API_KEY missing. Set it in .env")
-
-    channel_id=_resolve_channel_id(channel_url)
-    if not channel_id:
-        raise ValueError(f"Could not resolve channel: {channel_url}")
-      
+    channel_id: str,
+    num_videos: int,
+    start_date: str | None,
+    end_date: str | None,
+    api_key: str,
+) -> list[dict]:
+    """Run search.list for a channel, falling back to a generic search by handle/name."""
     search_url = "https://www.googleapis.com/youtube/v3/search"
     published_after = _iso_date(start_date, "00:00:00") if start_date else None
     published_before = _iso_date(end_date, "23:59:59") if end_date else None
@@ -93,7 +84,7 @@ def fetch_channel_videos(
         "channelId": channel_id,
         "order": "date",
         "maxResults": min(num_videos, 5),  # API limit per request
-        "key": YOUTUBE_API_KEY,
+        "key": api_key,
         "type": "video",
     }
     if published_after:
@@ -117,7 +108,7 @@ def fetch_channel_videos(
                 "q": channel_id,
                 "order": "date",
                 "maxResults": min(num_videos, 5),
-                "key": YOUTUBE_API_KEY,
+                "key": api_key,
                 "type": "video",
             }
             if published_after:
@@ -134,6 +125,132 @@ def fetch_channel_videos(
         except Exception as e:
             print(f"Fallback search failed for {channel_url}: {e}")
             items = []
+
+    return items
+
+def _fetch_video_details(video_ids: list[str], api_key: str) -> dict[str, dict]:
+    """
+    Fetch snippet + statistics for many videos with videos.list,
+    50 comma-joined ids per request (API limit). Returns {videoId: item}.
+    """
+    videos_url = "https://www.googleapis.com/youtube/v3/videos"
+    details = {}
+    for i in range(0, len(video_ids), 50):
+        params = {
+            "part": "snippet,statistics",
+            "id": ",".join(video_ids[i:i + 50]),
+            "key": api_key,
+        }
+        try:
+            resp = requests.get(videos_url, params=params, timeout=10)
+            resp.raise_for_status()
+            for item in resp.json().get("items", []):
+                details[item["id"]] = item
+        except Exception as e:
+            print(f"Video details lookup failed: {e}")
+    return details
+
+def _build_video(vid: str, snippet: dict, statistics: dict | None = None) -> dict:
+    return {
+        "title": snippet.get("title", ""),
+        "url": f"https://www.youtube.com/watch?v={vid}",
+        "shortcode": vid,
+        "description": snippet.get("description", ""),
+        "thumbnail": (snippet.get("thumbnails", {}).get("high") or {}).get(
+            "url", ""
+        ),
+        "views": (statistics or {}).get("viewCount", ""),
+        "published_date": snippet.get("publishedAt", ""),
+        "channel": snippet.get("channelTitle", ""),
+        "transcript": [],
+        "formatted_transcript": [],
+    }
+
+def fetch_video_transcript(v: dict, transcript_timeout: float = 8.0) -> dict:
+    """
+    Fill a video dict's transcript fields in place (with fallbacks) and return it.
+    """
+    vid= v["shortcode"]
+    print(f"Transcript for {vid}...")
+    start_t=time.time()
+    formatted = []
+    raw_text = []
+    try:
+        # Try listing available transcripts to pick best option
+        available = YouTubeTranscriptApi.list_transcripts(vid)
+        transcript_obj = None
+        try:
+            transcript_obj = available.find_transcript(['en'])
+        except:
+            try:
+                transcript_obj = available.find_manually_created_transcript(['en'])
+            except:
+                try:
+                    transcript_obj = available.find_generated_transcript(['en'])
+                except:
+                    # If no English, grab the first available
+                    transcript_obj = next(iter(available))
+        transcript_data = transcript_obj.fetch()
+    except Exception as e2:
+        elapsed = time.time() - start_t
+        print(f"Transcript failed for {vid} after {elapsed:.1f}s: {e2}")
+        transcript_data = []
+
+    for t in transcript_data:
+        text = t.get("text", "")
+        if not text:
+            continue
+        start_time = t.get("start", 0.0)
+        end_time = start_time + t.get("duration", 0.0)
+        formatted.append(
+            {
+                "text": text,
+                "start_time": start_time,
+                "end_time": end_time,
+            }
+        )
+        raw_text.append(text)
+    
+    v["formatted_transcript"] = formatted
+    v["transcript"] = raw_text
+
+     # If still empty, synthesize a minimal transcript from metadata so analysis can proceed
+    if not v["formatted_transcript"]:
+        synthesized = f"Title: {v.get('title','')}. Description: {v.get('description','')}. URL: {v.get('url','')}"#usage of fstrings for all format support w/o .format method or +.
+        v["formatted_transcript"] = [
+            {
+                "text": synthesized,
+                "start_time": 0.0,
+                "end_time": 0.0,
+            }
+        ]
+        v["transcript"] = [synthesized]
+
+    return v
+
+def fetch_channel_videos(
+    channel_url: str,
+    num_videos: int = 3,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    get_transcripts: bool = True,
+    transcript_timeout: float = 8.0,
+    api_key: str | None = None,
+):
+    """
+    Fetch latest videos from a channel using YouTube Data API v3.
+    Returns list of dicts with metadata and optional transcripts.
+    api_key defaults to YOUTUBE_API_KEY from the environment.
+    """
+    api_key = api_key or YOUTUBE_API_KEY
+    if not api_key:
+        raise ValueError("YOUTUBE_API_KEY missing. Set it in .env")
+
+    channel_id=_resolve_channel_id(channel_url, api_key)
+    if not channel_id:
+        raise ValueError(f"Could not resolve channel: {channel_url}")
+
+    items = _search_channel_items(channel_url, channel_id, num_videos, start_date, end_date, api_key)
     
     videos = []
     
@@ -141,84 +258,70 @@ def fetch_channel_videos(
         vid = item["id"].get("videoId")
         if not vid:
             continue
-        snippet = item.get("snippet",{})
-        videos.append(
-            {
-                "title": snippet.get("title", ""),
-                "url": f"https://www.youtube.com/watch?v={vid}",
-                "shortcode": vid,
-                "description": snippet.get("description", ""),
-                "thumbnail": (snippet.get("thumbnails", {}).get("high") or {}).get(
-                    "url", ""
-                ),
-                "views": "",
-                "published_date": snippet.get("publishedAt", ""),
-                "channel": snippet.get("channelTitle", ""),
-                "transcript": [],
-                "formatted_transcript": [],
-            }
-        )
+        videos.append(_build_video(vid, item.get("snippet",{})))
     #Limit to requested count
     videos = videos[:num_videos]
 
     if not get_transcripts or not videos:
         return videos
     #fetch transcripts with fallbacks
-    for idx, v in enumerate(videos):
-        vid= v["shortcode"]
-        print(f"Transcript {idx+1}/{len(videos)} for {vid}...")
-        start_t=time.time()
-        formatted = []
-        raw_text = []
-        try:
-            # Try listing available transcripts to pick best option
-            available = YouTubeTranscriptApi.list_transcripts(vid)
-            transcript_obj = None
-            try:
-                transcript_obj = available.find_transcript(['en'])
-            except:
-                try:
-                    transcript_obj = available.find_manually_created_transcript(['en'])
-                except:
-                    try:
-                        transcript_obj = available.find_generated_transcript(['en'])
-                    except:
-                        # If no English, grab the first available
-                        transcript_obj = next(iter(available))
-            transcript_data = transcript_obj.fetch()
-        except Exception as e2:
-            elapsed = time.time() - start_t
-            print(f"Transcript failed for {vid} after {elapsed:.1f}s: {e2}")
-            transcript_data = []
-
-        for t in transcript_data:
-            text = t.get("text", "")
-            if not text:
-                continue
-            start_time = t.get("start", 0.0)
-            end_time = start_time + t.get("duration", 0.0)
-            formatted.append(
-                {
-                    "text": text,
-                    "start_time": start_time,
-                    "end_time": end_time,
-                }
-            )
-            raw_text.append(text)
-        
-        v["formatted_transcript"] = formatted
-        v["transcript"] = raw_text
-
-         # If still empty, synthesize a minimal transcript from metadata so analysis can proceed
-        if not v["formatted_transcript"]:
-            synthesized = f"Title: {v.get('title','')}. Description: {v.get('description','')}. URL: {v.get('url','')}"#usage of fstrings for all format support w/o .format method or +.
-            v["formatted_transcript"] = [
-                {
-                    "text": synthesized,
-                    "start_time": 0.0,
-                    "end_time": 0.0,
-                }
-            ]
-            v["transcript"] = [synthesized]
+    for v in videos:
+        fetch_video_transcript(v, transcript_timeout)
 
     return videos
+
+def fetch_channels_batch(
+    channel_urls: list[str],
+    num_videos: int = 3,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    api_key: str | None = None,
+    max_workers: int = 8,
+) -> tuple[list[dict], dict[str, str]]:
+    """
+    Fetch latest videos (metadata only) for several channels at once.
+    Channel resolution and searches run in parallel, then metadata for every
+    video is fetched with batched videos.list calls (50 ids per request).
+    Transcripts are left empty; fill them with fetch_video_transcript.
+    Returns (videos in channel order, {channel_url: error message}).
+    """
+    api_key = api_key or YOUTUBE_API_KEY
+    if not api_key:
+        raise ValueError("YOUTUBE_API_KEY missing. Set it in .env")
+    if not channel_urls:
+        return [], {}
+
+    errors = {}
+    workers = min(len(channel_urls), max_workers)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        channel_ids = list(executor.map(lambda url: _resolve_channel_id(url, api_key), channel_urls))
+        resolved = [(url, cid) for url, cid in zip(channel_urls, channel_ids) if cid]
+        for url, cid in zip(channel_urls, channel_ids):
+            if not cid:
+                errors[url] = f"Could not resolve channel: {url}"
+
+        search_results = list(executor.map(
+            lambda pair: _search_channel_items(pair[0], pair[1], num_videos, start_date, end_date, api_key),
+            resolved,
+        ))
+
+    # Candidate ids per channel, in search (date) order
+    channel_video_ids = []
+    for items in search_results:
+        vids = [item["id"].get("videoId") for item in items]
+        channel_video_ids.append([vid for vid in vids if vid][:num_videos])
+
+    details = _fetch_video_details([vid for vids in channel_video_ids for vid in vids], api_key)
+
+    videos = []
+    for items, vids in zip(search_results, channel_video_ids):
+        snippets = {item["id"].get("videoId"): item.get("snippet", {}) for item in items}
+        for vid in vids:
+            detail = details.get(vid)
+            if detail:
+                videos.append(_build_video(vid, detail.get("snippet", {}), detail.get("statistics")))
+            else:
+                videos.append(_build_video(vid, snippets.get(vid, {})))
+
+    return videos, errors